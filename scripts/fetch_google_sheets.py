@@ -10,22 +10,45 @@ Requirements:
 2. Sheet should have columns matching the reading log data structure
 3. First row should contain headers
 
+Optional packages (used when installed, not required):
+    pyarrow: Faster CSV parsing for very large sheets
+    orjson: Faster JSON encoding of the generated data file
+
 Usage:
     python fetch_google_sheets.py --sheet-id YOUR_SHEET_ID --output-file src/data/readingData.js
 
 Environment Variables:
     GOOGLE_SHEETS_API_KEY: Your Google Sheets API key (optional for public sheets)
     GOOGLE_SHEET_ID: Default sheet ID to use
-    GOOGLE_SHEET_RANGE: Default range to fetch (default: Sheet1!A:Z)
+    GOOGLE_SHEET_RANGE: Default range to fetch with an API key (default: A:Z, the first visible tab)
 """
 
 import argparse
+import csv
+import io
+import itertools
 import json
 import os
 import sys
 import requests
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, BinaryIO, Callable, Iterator, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+except ImportError:  # pyarrow is optional - fall back to the stdlib csv module
+    pa = pac = None
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib json module
+    orjson = None
+
+# Range read through the Sheets API. Without a tab name the API uses the first
+# visible tab, matching the gid=0 CSV export (form-linked sheets call it
+# "Form Responses 1", not "Sheet1").
+DEFAULT_RANGE = 'A:Z'
 
 # Column mapping from Google Sheets to reading log format
 COLUMN_MAPPING = {
@@ -52,54 +75,182 @@ COLUMN_MAPPING = {
     'date_read': 'dateRead'
 }
 
-def fetch_sheet_data(sheet_id: str, range_name: str = "Sheet1!A:Z", api_key: Optional[str] = None) -> List[List[str]]:
+# Closes the data array and defines the helpers exported alongside it.
+# Everything after the serialized entries is fixed, so it is built once here.
+JS_HELPERS = ''';
+
+export const getReadingStats = (data) => {
+  const readItems = data.filter(item => item.status === 'read').length;
+  const inProgress = data.filter(item => item.status === 'in-progress').length;
+  const toRead = data.filter(item => item.status === 'to-read').length;
+  
+  const ratedItems = data.filter(item => item.rating !== null);
+  const averageRating = ratedItems.length > 0 
+    ? (ratedItems.reduce((sum, item) => sum + item.rating, 0) / ratedItems.length).toFixed(1)
+    : 0;
+    
+  const impactItems = data.filter(item => item.impact !== null);
+  const averageImpact = impactItems.length > 0
+    ? (impactItems.reduce((sum, item) => sum + item.impact, 0) / impactItems.length).toFixed(1)
+    : 0;
+
+  return {
+    totalItems: data.length,
+    readItems,
+    inProgress,
+    toRead,
+    averageRating: parseFloat(averageRating),
+    averageImpact: parseFloat(averageImpact)
+  };
+};
+
+export const getTagFrequency = (data) => {
+  const tagCounts = {};
+  data.forEach(item => {
+    item.tags.forEach(tag => {
+      tagCounts[tag] = (tagCounts[tag] || 0) + 1;
+    });
+  });
+  return tagCounts;
+};
+'''
+
+# Upper bound on the number of CSV columns read as plain strings by pyarrow
+MAX_CSV_COLUMNS = 1024
+
+def parse_csv(stream: BinaryIO, encoding: str = 'utf-8') -> List[List[str]]:
+    """
+    Parse a CSV export into rows of strings.
+    
+    Without pyarrow, the stream is parsed incrementally by the stdlib csv
+    module. With pyarrow, the body is read once and parsed by its
+    multi-threaded reader, with the header row read as data so that every
+    column keeps its raw string values (no type inference). Input pyarrow
+    cannot represent the same way as the csv module - an empty body, rows with
+    differing column counts, or more than MAX_CSV_COLUMNS columns - is parsed
+    with the csv module instead. Blank lines are kept as rows of empty cells so
+    row numbers stay aligned with the sheet.
+    
+    Args:
+        stream: Binary file-like object yielding the CSV bytes
+        encoding: Text encoding of the CSV data
+    
+    Returns:
+        List of rows, where each row is a list of cell values
+    """
+    if pac is None:
+        return list(csv.reader(io.TextIOWrapper(stream, encoding=encoding, newline='')))
+    
+    content = stream.read()
+    column_names = [f"f{i}" for i in range(MAX_CSV_COLUMNS)]
+    try:
+        table = pac.read_csv(
+            io.BytesIO(content),
+            read_options=pac.ReadOptions(use_threads=True, autogenerate_column_names=True, encoding=encoding),
+            parse_options=pac.ParseOptions(newlines_in_values=True, ignore_empty_lines=False),
+            convert_options=pac.ConvertOptions(
+                column_types={name: pa.string() for name in column_names},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+    except pa.ArrowInvalid:
+        table = None
+    
+    if table is None or not all(pa.types.is_string(column_type) for column_type in table.schema.types):
+        return list(csv.reader(io.StringIO(content.decode(encoding), newline='')))
+    
+    columns = [column.to_pylist() for column in table.columns]
+    return [list(row) for row in zip(*columns)]
+
+def fetch_sheet_data(sheet_id: str, range_name: str = DEFAULT_RANGE, api_key: Optional[str] = None) -> List[List[str]]:
     """
-    Fetch data from Google Sheets using the Sheets API.
+    Fetch data from Google Sheets.
+    
+    Uses the Sheets API when an API key is available (argument or
+    GOOGLE_SHEETS_API_KEY), otherwise the sheet's public CSV export. The
+    default range has no tab name, so the API reads the first visible tab -
+    the same tab as the gid=0 CSV export, whatever it is called. If the API
+    request fails, the CSV export is tried instead.
     
     Args:
         sheet_id: The Google Sheet ID
-        range_name: The range to fetch (A1 notation)
+        range_name: The range to fetch with the API (A1 notation)
         api_key: Google Sheets API key (optional for public sheets)
     
     Returns:
         List of rows, where each row is a list of cell values
     """
-    # Try public CSV export first (simpler approach)
+    if not api_key:
+        api_key = os.getenv('GOOGLE_SHEETS_API_KEY')
+    
+    # With an API key, a single Sheets API call is usually enough
+    if api_key:
+        values = fetch_api_values(sheet_id, range_name, api_key)
+        if values is not None:
+            return values
+        print("↪ Falling back to the public CSV export")
+    
     csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid=0"
     
     try:
-        response = requests.get(csv_url)
-        if response.status_code == 200:
-            # Parse CSV data
-            import csv
-            import io
-            
-            csv_data = []
-            reader = csv.reader(io.StringIO(response.text))
-            for row in reader:
-                csv_data.append(row)
-            
+        csv_data = fetch_csv_export(csv_url)
+        if csv_data is not None:
             print(f"✓ Successfully fetched {len(csv_data)} rows from public CSV export")
             return csv_data
             
     except Exception as e:
         print(f"⚠ CSV export failed: {e}")
     
-    # Fallback to Sheets API
-    if not api_key:
-        api_key = os.getenv('GOOGLE_SHEETS_API_KEY')
-        
-    if not api_key:
+    if api_key:
+        print("❌ Sheets API request and CSV export both failed. Please:")
+        print(f"   1. Check that the API key is valid and the range '{range_name}' exists (pass --range), OR")
+        print("   2. Make your Google Sheet publicly viewable")
+    else:
         print("❌ No API key provided and CSV export failed. Please:")
         print("   1. Make your Google Sheet publicly viewable, OR")
         print("   2. Set GOOGLE_SHEETS_API_KEY environment variable")
-        sys.exit(1)
+    sys.exit(1)
+
+def fetch_csv_export(csv_url: str) -> Optional[List[List[str]]]:
+    """
+    Download a CSV export and parse it while it streams in.
     
+    Args:
+        csv_url: URL of the CSV export
+    
+    Returns:
+        List of rows, or None if the server did not answer with 200 OK
+    """
+    # Stream the body straight into the parser instead of buffering it
+    with requests.get(csv_url, stream=True, timeout=30) as response:
+        if response.status_code != 200:
+            return None
+        
+        # Undo any gzip transfer encoding, and keep the raw stream open at EOF:
+        # urllib3 otherwise closes it once Content-Length bytes are read, and
+        # the csv module's TextIOWrapper then fails reading a closed file.
+        response.raw.decode_content = True
+        response.raw.auto_close = False
+        return parse_csv(response.raw, response.encoding or 'utf-8')
+
+def fetch_api_values(sheet_id: str, range_name: str, api_key: str) -> Optional[List[List[str]]]:
+    """
+    Fetch a range from the Sheets API in a single request.
+    
+    Args:
+        sheet_id: The Google Sheet ID
+        range_name: The range to fetch (A1 notation)
+        api_key: Google Sheets API key
+    
+    Returns:
+        List of rows, or None if the request failed
+    """
     api_url = f"https://sheets.googleapis.com/v4/spreadsheets/{sheet_id}/values/{range_name}"
     params = {'key': api_key}
     
     try:
-        response = requests.get(api_url, params=params)
+        response = requests.get(api_url, params=params, timeout=30)
         response.raise_for_status()
         
         data = response.json()
@@ -109,88 +260,206 @@ def fetch_sheet_data(sheet_id: str, range_name: str = "Sheet1!A:Z", api_key: Opt
         return values
         
     except requests.exceptions.RequestException as e:
-        print(f"❌ Failed to fetch data from Sheets API: {e}")
-        sys.exit(1)
+        print(f"⚠ Failed to fetch data from Sheets API: {e}")
+        return None
+
+def split_values(value: str, separator: str) -> List[str]:
+    """Split a string on separator, returning the stripped, non-empty parts."""
+    if not value:
+        return []
+    return [part for item in value.split(separator) if (part := item.strip())]
 
 def parse_tags(tags_str: str) -> List[str]:
     """Parse tags from string format (comma-separated)."""
-    if not tags_str:
-        return []
-    return [tag.strip() for tag in tags_str.split(',') if tag.strip()]
+    return split_values(tags_str, ',')
 
 def parse_quotes(quotes_str: str) -> List[str]:
     """Parse quotes from string format (pipe-separated)."""
-    if not quotes_str:
-        return []
-    return [quote.strip() for quote in quotes_str.split('|') if quote.strip()]
+    return split_values(quotes_str, '|')
 
 def parse_related_to(related_str: str) -> List[str]:
     """Parse related IDs from string format (comma-separated)."""
-    if not related_str:
-        return []
-    return [id.strip() for id in related_str.split(',') if id.strip()]
+    return split_values(related_str, ',')
 
-def convert_row_to_entry(headers: List[str], row: List[str]) -> Dict[str, Any]:
+def parse_int(value: str) -> Optional[int]:
+    """Parse a numeric value (e.g. rating or impact) into an int."""
+    if not value:
+        return None
+    try:
+        # Whole numbers are the common case, so avoid the float round trip
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+# Parsers for fields that need more than the stripped cell value. Each parser
+# also produces the field's default when called with an empty string.
+FIELD_PARSERS = {
+    'tags': parse_tags,
+    'quotes': parse_quotes,
+    'relatedTo': parse_related_to,
+    'rating': parse_int,
+    'impact': parse_int,
+}
+
+# Defaults for plain text fields left empty in the sheet
+FIELD_DEFAULTS = {
+    'language': 'en',
+    'status': 'to-read',
+}
+
+# (column index or None, log field, parser, default) for each mapped column
+ConversionPlan = List[Tuple[Optional[int], str, Optional[Callable[[str], Any]], str]]
+
+def normalize_header(header: str) -> str:
+    """Normalize a sheet header to its COLUMN_MAPPING key (e.g. 'Date Read' -> 'date_read')."""
+    return header.lower().replace(' ', '_')
+
+def build_plan(headers: List[str]) -> ConversionPlan:
     """
-    Convert a spreadsheet row to a reading log entry.
+    Build a conversion plan for rows with the given headers.
+    
+    The plan resolves each COLUMN_MAPPING entry to its column index once, so
+    converting a row is a flat loop over the plan instead of building a dict
+    of the whole row first.
+    
+    Args:
+        headers: List of column headers, already passed through normalize_header()
+    
+    Returns:
+        List of (column index or None, log field, parser, default) tuples
+    """
+    # Later duplicates win, matching the previous per-row dict behaviour
+    indexes = {header: i for i, header in enumerate(headers)}
+    return [
+        (indexes.get(sheet_col), log_field, FIELD_PARSERS.get(log_field), FIELD_DEFAULTS.get(log_field, ""))
+        for sheet_col, log_field in COLUMN_MAPPING.items()
+    ]
+
+def generate_fallback_ids() -> Iterator[str]:
+    """
+    Generate unique IDs for entries that have neither an ID nor a title.
+    
+    The timestamp is taken once per run and a counter keeps the IDs unique.
+    
+    Returns:
+        Iterator of IDs like entry_20250101_120000_0
+    """
+    run_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return (f"entry_{run_ts}_{n}" for n in itertools.count())
+
+def convert_planned_row(plan: ConversionPlan, row: List[str], fallback_ids: Optional[Iterator[str]] = None) -> Dict[str, Any]:
+    """
+    Convert a spreadsheet row to a reading log entry using a prebuilt plan.
     
     Args:
-        headers: List of column headers
+        plan: Conversion plan from build_plan()
         row: List of cell values for this row
+        fallback_ids: IDs for rows without an ID or title (see generate_fallback_ids)
     
     Returns:
         Dictionary representing a reading log entry
     """
-    # Create a mapping from headers to values
-    row_data = {}
-    for i, header in enumerate(headers):
-        value = row[i] if i < len(row) else ""
-        row_data[header.lower().replace(' ', '_')] = value.strip()
-    
-    # Convert to reading log format
     entry = {}
+    row_length = len(row)
     
-    for sheet_col, log_field in COLUMN_MAPPING.items():
-        value = row_data.get(sheet_col, "")
+    for index, log_field, parse, default in plan:
+        value = row[index].strip() if index is not None and index < row_length else ""
         
-        if not value:
-            # Set defaults for required fields
-            if log_field == 'id':
-                # Generate ID from title if not provided
-                title = row_data.get('title', '')
-                entry[log_field] = title.lower().replace(' ', '_').replace('-', '_')[:50] if title else f"entry_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            elif log_field == 'tags':
-                entry[log_field] = []
-            elif log_field == 'quotes':
-                entry[log_field] = []
-            elif log_field == 'relatedTo':
-                entry[log_field] = []
-            elif log_field in ['rating', 'impact']:
-                entry[log_field] = None
-            elif log_field == 'language':
-                entry[log_field] = 'en'
-            elif log_field == 'status':
-                entry[log_field] = 'to-read'
-            else:
-                entry[log_field] = value
+        if parse is not None:
+            entry[log_field] = parse(value)
         else:
-            # Process specific field types
-            if log_field == 'tags':
-                entry[log_field] = parse_tags(value)
-            elif log_field == 'quotes':
-                entry[log_field] = parse_quotes(value)
-            elif log_field == 'relatedTo':
-                entry[log_field] = parse_related_to(value)
-            elif log_field in ['rating', 'impact']:
-                try:
-                    entry[log_field] = int(float(value)) if value else None
-                except ValueError:
-                    entry[log_field] = None
-            else:
-                entry[log_field] = value
+            entry[log_field] = value or default
+    
+    if not entry['id']:
+        # Generate ID from title if not provided
+        title = entry['title']
+        if title:
+            entry['id'] = title.lower().replace(' ', '_').replace('-', '_')[:50]
+        else:
+            entry['id'] = next(fallback_ids or generate_fallback_ids())
     
     return entry
 
+def convert_row_to_entry(headers: List[str], row: List[str]) -> Dict[str, Any]:
+    """
+    Convert a spreadsheet row to a reading log entry.
+    
+    When converting many rows, build the plan once with build_plan() and
+    call convert_planned_row() instead.
+    
+    Args:
+        headers: List of column headers, already passed through normalize_header()
+        row: List of cell values for this row
+    
+    Returns:
+        Dictionary representing a reading log entry
+    """
+    return convert_planned_row(build_plan(headers), row)
+
+def is_empty_row(row: List[str]) -> bool:
+    """Check whether every cell in a row is empty or whitespace."""
+    return not any(row) or not ''.join(row).strip()
+
+def convert_rows(plan: ConversionPlan, rows: List[List[str]]) -> List[Dict[str, Any]]:
+    """
+    Convert data rows to reading log entries, skipping empty rows.
+    
+    Rows that fail to convert are reported and skipped.
+    
+    Args:
+        plan: Conversion plan from build_plan()
+        rows: Data rows (without the header row)
+    
+    Returns:
+        List of reading log entries
+    """
+    fallback_ids = generate_fallback_ids()
+    
+    def safe_convert(row_number: int, row: List[str]) -> Optional[Dict[str, Any]]:
+        try:
+            return convert_planned_row(plan, row, fallback_ids)
+        except Exception as e:
+            print(f"⚠ Warning: Failed to process row {row_number}: {e}")
+            return None
+    
+    converted = (safe_convert(i, row) for i, row in enumerate(rows, 1) if not is_empty_row(row))
+    return [entry for entry in converted if entry is not None]
+
+def encode_entry(entry: Dict[str, Any]) -> bytes:
+    """Encode one entry as compact UTF-8 JSON, using orjson when it can."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(entry)
+        except orjson.JSONEncodeError:
+            # orjson rejects values such as integers beyond 64 bits
+            pass
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def write_entries(f: BinaryIO, entries: List[Dict[str, Any]]):
+    """
+    Write entries to a binary file as a UTF-8 JSON array, one compact entry per line.
+    
+    Uses orjson when available, falling back to the stdlib json module for
+    entries orjson cannot encode. Both use the same compact separators, so
+    the output does not depend on which encoder is installed.
+    
+    Args:
+        f: Binary file object to write to
+        entries: List of reading log entries
+    """
+    if not entries:
+        f.write(b'[]')
+        return
+    
+    # Write the brackets separately so the encoded payload is not copied again
+    f.write(b'[\n  ')
+    f.write(b',\n  '.join([encode_entry(entry) for entry in entries]))
+    f.write(b'\n]')
+
 def generate_js_file(entries: List[Dict[str, Any]], output_file: str):
     """
     Generate the JavaScript data file for the reading log.
@@ -199,59 +468,28 @@ def generate_js_file(entries: List[Dict[str, Any]], output_file: str):
         entries: List of reading log entries
         output_file: Path to output JavaScript file
     """
-    js_content = f'''// Auto-generated from Google Sheets on {datetime.now().isoformat()}
+    header = f'''// Auto-generated from Google Sheets on {datetime.now().isoformat()}
 // Do not edit this file manually - changes will be overwritten
 
-export const allSampleData = {json.dumps(entries, indent=2, ensure_ascii=False)};
-
-export const getReadingStats = (data) => {{
-  const readItems = data.filter(item => item.status === 'read').length;
-  const inProgress = data.filter(item => item.status === 'in-progress').length;
-  const toRead = data.filter(item => item.status === 'to-read').length;
-  
-  const ratedItems = data.filter(item => item.rating !== null);
-  const averageRating = ratedItems.length > 0 
-    ? (ratedItems.reduce((sum, item) => sum + item.rating, 0) / ratedItems.length).toFixed(1)
-    : 0;
-    
-  const impactItems = data.filter(item => item.impact !== null);
-  const averageImpact = impactItems.length > 0
-    ? (impactItems.reduce((sum, item) => sum + item.impact, 0) / impactItems.length).toFixed(1)
-    : 0;
-
-  return {{
-    totalItems: data.length,
-    readItems,
-    inProgress,
-    toRead,
-    averageRating: parseFloat(averageRating),
-    averageImpact: parseFloat(averageImpact)
-  }};
-}};
-
-export const getTagFrequency = (data) => {{
-  const tagCounts = {{}};
-  data.forEach(item => {{
-    item.tags.forEach(tag => {{
-      tagCounts[tag] = (tagCounts[tag] || 0) + 1;
-    }});
-  }});
-  return tagCounts;
-}};
-'''
+export const allSampleData = '''
     
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    # Ensure output directory exists (a bare file name has no directory part)
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(js_content)
+    # Write the pieces in turn rather than building one large string
+    with open(output_file, 'wb') as f:
+        f.write(header.encode('utf-8'))
+        write_entries(f, entries)
+        f.write(JS_HELPERS.encode('utf-8'))
     
     print(f"✓ Generated {output_file} with {len(entries)} entries")
 
 def main():
     parser = argparse.ArgumentParser(description='Fetch Google Sheets data and convert to reading log format')
     parser.add_argument('--sheet-id', required=True, help='Google Sheet ID')
-    parser.add_argument('--range', default='Sheet1!A:Z', help='Sheet range to fetch (default: Sheet1!A:Z)')
+    parser.add_argument('--range', default=os.getenv('GOOGLE_SHEET_RANGE') or DEFAULT_RANGE, help=f'Sheet range to fetch with an API key (default: GOOGLE_SHEET_RANGE or {DEFAULT_RANGE}, the first visible tab)')
     parser.add_argument('--output-file', default='src/data/readingData.js', help='Output JavaScript file')
     parser.add_argument('--api-key', help='Google Sheets API key (optional)')
     
@@ -267,23 +505,15 @@ def main():
         sys.exit(1)
     
     # First row should be headers
-    headers = [header.lower().replace(' ', '_') for header in rows[0]]
+    headers = [normalize_header(header) for header in rows[0]]
     data_rows = rows[1:]
     
     print(f"📊 Found columns: {', '.join(headers)}")
     print(f"📝 Processing {len(data_rows)} data rows...")
     
     # Convert rows to reading log entries
-    entries = []
-    for i, row in enumerate(data_rows, 1):
-        if not any(cell.strip() for cell in row):  # Skip empty rows
-            continue
-            
-        try:
-            entry = convert_row_to_entry(headers, row)
-            entries.append(entry)
-        except Exception as e:
-            print(f"⚠ Warning: Failed to process row {i}: {e}")
+    plan = build_plan(headers)
+    entries = convert_rows(plan, data_rows)
     
     if not entries:
         print("❌ No valid entries found")
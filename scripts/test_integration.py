@@ -5,55 +5,100 @@ Test script for Google Sheets integration
 This script helps test the Google Sheets to Reading Log integration
 without running the full GitHub Actions workflow.
 
+Fetched rows are cached in .sheets_cache/ for an hour so repeated runs do not
+hit Google every time; pass --no-cache to always fetch fresh data.
+
 Usage:
     python scripts/test_integration.py --sheet-id YOUR_SHEET_ID
 """
 
 import argparse
+import gzip
+import hashlib
+import http.server
+import json
 import sys
 import os
+import threading
+import time
+from typing import List, Optional, Tuple
 
 # Add the scripts directory to the path so we can import our module
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from fetch_google_sheets import fetch_sheet_data, convert_row_to_entry, generate_js_file
+import fetch_google_sheets
+from fetch_google_sheets import DEFAULT_RANGE, fetch_csv_export, fetch_sheet_data, build_plan, convert_row_to_entry, convert_rows, generate_js_file, normalize_header
+
+CACHE_DIR = ".sheets_cache"
+CACHE_TTL_SECONDS = 3600
+
+def fetch_rows_cached(sheet_id: str, range_name: str, api_key: str = None, use_cache: bool = True) -> Tuple[List[List[str]], bool]:
+    """
+    Fetch sheet rows, reusing a local copy younger than CACHE_TTL_SECONDS.
+    
+    Whether an API key is configured is part of the cache key, so keyed runs
+    (which try the Sheets API first) and keyless runs (CSV export only) do not
+    share an entry. A keyed entry may still hold rows from the CSV fallback.
+    
+    Returns:
+        The rows, and whether they came from the cache
+    """
+    source = 'api' if api_key or os.getenv('GOOGLE_SHEETS_API_KEY') else 'csv'
+    key = hashlib.sha256(f"{sheet_id}\0{range_name}\0{source}".encode('utf-8')).hexdigest()
+    cache_file = os.path.join(CACHE_DIR, f"{key}.json")
+    
+    if use_cache and os.path.exists(cache_file) and time.time() - os.path.getmtime(cache_file) < CACHE_TTL_SECONDS:
+        with open(cache_file, encoding='utf-8') as f:
+            rows = json.load(f)
+        print(f"📦 Using cached sheet data from {cache_file} (pass --no-cache to refetch)")
+        return rows, True
+    
+    rows = fetch_sheet_data(sheet_id, range_name, api_key)
+    
+    if use_cache and rows:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump(rows, f, ensure_ascii=False)
+    
+    return rows, False
 
-def test_sheet_access(sheet_id: str, api_key: str = None):
-    """Test if we can access the Google Sheet."""
+def test_sheet_access(sheet_id: str, api_key: str = None, use_cache: bool = True) -> Optional[List[List[str]]]:
+    """Test if we can access the Google Sheet, returning the fetched rows."""
     print("🔍 Testing Google Sheet access...")
     
     try:
-        rows = fetch_sheet_data(sheet_id, "Sheet1!A:Z", api_key)
+        rows, from_cache = fetch_rows_cached(sheet_id, DEFAULT_RANGE, api_key, use_cache)
         
         if not rows:
             print("❌ No data found in sheet")
-            return False
+            return None
         
-        print(f"✅ Successfully accessed sheet with {len(rows)} rows")
+        if from_cache:
+            print(f"⚠ Loaded {len(rows)} cached rows - sheet access was NOT re-tested (pass --no-cache to test it)")
+        else:
+            print(f"✅ Successfully accessed sheet with {len(rows)} rows")
         
         # Show first few rows for verification
         print("\n📋 First few rows:")
         for i, row in enumerate(rows[:3]):
             print(f"  Row {i+1}: {row[:5]}...")  # Show first 5 columns
         
-        return True
+        return rows
         
     except Exception as e:
         print(f"❌ Failed to access sheet: {e}")
-        return False
+        return None
 
-def test_data_conversion(sheet_id: str, api_key: str = None):
+def test_data_conversion(rows: List[List[str]]):
     """Test the data conversion process."""
     print("\n🔄 Testing data conversion...")
     
     try:
-        rows = fetch_sheet_data(sheet_id, "Sheet1!A:Z", api_key)
-        
         if len(rows) < 2:
             print("❌ Need at least 2 rows (header + data)")
             return False
         
-        headers = [header.lower().replace(' ', '_') for header in rows[0]]
+        headers = [normalize_header(header) for header in rows[0]]
         data_rows = rows[1:]
         
         print(f"📊 Found columns: {', '.join(headers)}")
@@ -81,26 +126,20 @@ def test_data_conversion(sheet_id: str, api_key: str = None):
         print(f"❌ Data conversion failed: {e}")
         return False
 
-def test_file_generation(sheet_id: str, api_key: str = None):
+def test_file_generation(rows: List[List[str]]):
     """Test generating the JavaScript file."""
     print("\n📁 Testing file generation...")
     
     try:
-        rows = fetch_sheet_data(sheet_id, "Sheet1!A:Z", api_key)
-        
         if len(rows) < 2:
             print("❌ Need at least 2 rows (header + data)")
             return False
         
-        headers = [header.lower().replace(' ', '_') for header in rows[0]]
+        headers = [normalize_header(header) for header in rows[0]]
         data_rows = rows[1:]
         
-        # Convert all rows
-        entries = []
-        for row in data_rows:
-            if any(cell.strip() for cell in row):  # Skip empty rows
-                entry = convert_row_to_entry(headers, row)
-                entries.append(entry)
+        # Convert all rows the same way main() does
+        entries = convert_rows(build_plan(headers), data_rows)
         
         # Generate test file
         test_output = "test_output.js"
@@ -124,18 +163,74 @@ def test_file_generation(sheet_id: str, api_key: str = None):
         print(f"❌ File generation failed: {e}")
         return False
 
+SAMPLE_CSV = 'title,quotes\nSample Book,"First line\nsecond line | café"\n'.encode('utf-8')
+SAMPLE_ROWS = [['title', 'quotes'], ['Sample Book', 'First line\nsecond line | café']]
+
+class SampleCSVHandler(http.server.BaseHTTPRequestHandler):
+    """Serve SAMPLE_CSV with a Content-Length, gzip-encoded under /gzip."""
+    
+    def do_GET(self):
+        body = gzip.compress(SAMPLE_CSV) if self.path == '/gzip' else SAMPLE_CSV
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/csv; charset=utf-8')
+        if self.path == '/gzip':
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+def test_streamed_csv_parsing():
+    """Test parsing a streamed CSV response with the stdlib csv reader and, if installed, pyarrow."""
+    print("\n🌊 Testing streamed CSV parsing...")
+    
+    server = http.server.HTTPServer(('127.0.0.1', 0), SampleCSVHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    saved_pac = fetch_google_sheets.pac
+    parsers = [('stdlib csv', None)]
+    if saved_pac is not None:
+        parsers.append(('pyarrow', saved_pac))
+    
+    try:
+        for parser_name, pac in parsers:
+            fetch_google_sheets.pac = pac
+            for path in ('/plain', '/gzip'):
+                rows = fetch_csv_export(f"http://127.0.0.1:{server.server_port}{path}")
+                if rows != SAMPLE_ROWS:
+                    print(f"❌ Unexpected rows for {path} response with {parser_name}: {rows}")
+                    return False
+            
+            print(f"✅ Streamed plain and gzip responses parsed correctly with {parser_name}")
+        
+        if saved_pac is None:
+            print("ℹ pyarrow is not installed - skipped the pyarrow parser")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Streamed CSV parsing failed: {e}")
+        return False
+        
+    finally:
+        fetch_google_sheets.pac = saved_pac
+        server.shutdown()
+        server.server_close()
+
 def main():
     parser = argparse.ArgumentParser(description='Test Google Sheets integration')
     parser.add_argument('--sheet-id', required=True, help='Google Sheet ID to test')
     parser.add_argument('--api-key', help='Google Sheets API key (optional)')
+    parser.add_argument('--no-cache', action='store_true', help='Always fetch fresh data instead of using the local cache')
     
     args = parser.parse_args()
     
     print("🧪 Testing Google Sheets Integration")
     print("=" * 50)
     
-    # Test 1: Sheet access
-    if not test_sheet_access(args.sheet_id, args.api_key):
+    # Test 1: Sheet access (the fetched rows are reused by the other tests)
+    rows = test_sheet_access(args.sheet_id, args.api_key, use_cache=not args.no_cache)
+    if not rows:
         print("\n❌ Sheet access test failed. Please check:")
         print("  1. Sheet ID is correct")
         print("  2. Sheet is publicly accessible OR API key is valid")
@@ -143,7 +238,7 @@ def main():
         sys.exit(1)
     
     # Test 2: Data conversion
-    if not test_data_conversion(args.sheet_id, args.api_key):
+    if not test_data_conversion(rows):
         print("\n❌ Data conversion test failed. Please check:")
         print("  1. First row contains column headers")
         print("  2. Data rows contain valid information")
@@ -151,12 +246,18 @@ def main():
         sys.exit(1)
     
     # Test 3: File generation
-    if not test_file_generation(args.sheet_id, args.api_key):
+    if not test_file_generation(rows):
         print("\n❌ File generation test failed. Please check:")
         print("  1. Write permissions in current directory")
         print("  2. Data format is valid")
         sys.exit(1)
     
+    # Test 4: Streamed CSV parsing with each available parser (runs offline)
+    if not test_streamed_csv_parsing():
+        print("\n❌ Streamed CSV parsing test failed. Please check:")
+        print("  1. The CSV export stream is not closed before parsing finishes")
+        sys.exit(1)
+    
     print("\n🎉 All tests passed!")
     print("\n✅ Your Google Sheets integration is ready to use!")
     print("\nNext steps:")